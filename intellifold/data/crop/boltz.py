@@ -90,6 +90,7 @@ def pick_interface_token(
     tokens: np.ndarray,
     interface: np.ndarray,
     random: np.random.RandomState,
+    coords: np.ndarray,
 ) -> np.ndarray:
     """Pick a random token from an interface.
 
@@ -101,6 +102,8 @@ def pick_interface_token(
         The interface ID.
     random : np.ndarray
         The random state for reproducibility.
+    coords : np.ndarray
+        The atom coordinates, indexed by the token center_idx.
 
     Returns
     -------
@@ -124,8 +127,8 @@ def pick_interface_token(
         query = pick_random_token(tokens, random)
     else:
         # If we have tokens, compute distances
-        tokens_1_coords = tokens_1["center_coords"]
-        tokens_2_coords = tokens_2["center_coords"]
+        tokens_1_coords = coords[tokens_1["center_idx"]]
+        tokens_2_coords = coords[tokens_2["center_idx"]]
 
         dists = cdist(tokens_1_coords, tokens_2_coords)
         cuttoff = dists < const.interface_cutoff
@@ -214,6 +217,7 @@ class BoltzCropper(Cropper):
         mask = data.structure.mask
         chains = data.structure.chains
         interfaces = data.structure.interfaces
+        coords = data.structure.atoms["coords"]
 
         # Filter to valid chains
         valid_chains = chains[mask]
@@ -236,18 +240,18 @@ class BoltzCropper(Cropper):
             query = pick_chain_token(valid_tokens, chain_id, random)
         elif interface_id is not None:
             interface = interfaces[interface_id]
-            query = pick_interface_token(valid_tokens, interface, random)
+            query = pick_interface_token(valid_tokens, interface, random, coords)
         elif valid_interfaces.size:
             idx = random.randint(len(valid_interfaces))
             interface = valid_interfaces[idx]
-            query = pick_interface_token(valid_tokens, interface, random)
+            query = pick_interface_token(valid_tokens, interface, random, coords)
         else:
             idx = random.randint(len(valid_chains))
             chain_id = valid_chains[idx]["asym_id"]
             query = pick_chain_token(valid_tokens, chain_id, random)
 
         # Sort all tokens by distance to query_coords
-        dists = valid_tokens["center_coords"] - query["center_coords"]
+        dists = coords[valid_tokens["center_idx"]] - coords[query["center_idx"]]
         indices = np.argsort(np.linalg.norm(dists, axis=1))
 
         # Select cropped indices
@@ -565,7 +565,7 @@ def process_token_features(
     mol_type = from_numpy(token_data["mol_type"].copy()).long()
     res_type = from_numpy(token_data["res_type"].copy()).long()
     res_type = one_hot(res_type, num_classes=const.num_tokens)
-    disto_center = from_numpy(token_data["disto_coords"].copy())
+    disto_center = from_numpy(data.disto_coords())
     center_idx = from_numpy(token_data["center_idx"].copy())
     atom_nums = from_numpy(token_data["atom_num"].copy())
     atom_idx = from_numpy(token_data["atom_idx"].copy())
@@ -19,35 +19,183 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from dataclasses import astuple, dataclass
-
+import numba
 import numpy as np
+import numpy.typing as npt
+from numba import types
 
 from intellifold.data import const
 from intellifold.data.tokenize.tokenizer import Tokenizer
 from intellifold.data.types import Input, Token, TokenBond, Tokenized
 
+# Residue names with a known CCD entry, and the mol types of polymer chains
+_CCD_SET = frozenset(const.CCD_NAME_TO_ONE_LETTER)
+_POLYMER_TYPES = frozenset(
+    i for i, t in enumerate(const.chain_types) if t != "NONPOLYMER"
+)
+
+
+@numba.njit(
+    [
+        types.int64(
+            types.int32[::1],  # atom_1
+            types.int32[::1],  # atom_2
+            types.int32[::1],  # atom_to_token
+            types.int32[:, ::1],  # out
+        )
+    ],
+    cache=True,
+)
+def _remap_bonds(
+    atom_1: npt.NDArray[np.int32],
+    atom_2: npt.NDArray[np.int32],
+    atom_to_token: npt.NDArray[np.int32],
+    out: npt.NDArray[np.int32],
+) -> int:
+    """Write the token pairs of bonds between tokenized atoms to out.
+
+    Returns the number of rows written.
+    """
+    k = 0
+    for i in range(len(atom_1)):
+        token_1 = atom_to_token[atom_1[i]]
+        token_2 = atom_to_token[atom_2[i]]
+        if token_1 >= 0 and token_2 >= 0:
+            out[k, 0] = token_1
+            out[k, 1] = token_2
+            k += 1
+    return k
+
+
+@numba.njit(
+    [
+        types.void(
+            types.int64[::1],  # chain_ids
+            types.int64[::1],  # chain_token_idx
+            types.int32[:],  # chain_res_idx
+            types.int32[:],  # chain_res_num
+            types.boolean[::1],  # chain_is_polymer
+            types.int8[:],  # res_type
+            types.int32[:],  # res_idx
+            types.int32[:],  # res_atom_idx
+            types.int32[:],  # res_atom_num
+            types.int32[:],  # res_atom_center
+            types.int32[:],  # res_atom_disto
+            types.boolean[:],  # res_is_standard
+            types.boolean[:],  # res_is_present
+            types.boolean[::1],  # res_ccd_known
+            types.boolean[:],  # atom_is_present
+            types.int64,  # unk_id
+            types.int64[::1],  # token_chain
+            types.int32[:],  # token_atom_idx
+            types.int32[:],  # token_atom_num
+            types.int32[:],  # token_res_idx
+            types.int8[:],  # token_res_type
+            types.int32[:],  # token_center_idx
+            types.int32[:],  # token_disto_idx
+            types.boolean[:],  # token_resolved_mask
+            types.boolean[:],  # token_disto_mask
+            types.int32[::1],  # atom_to_token
+        )
+    ],
+    cache=True,
+    parallel=True,
+)
+def _tokenize_chains(
+    chain_ids: npt.NDArray[np.int64],
+    chain_token_idx: npt.NDArray[np.int64],
+    chain_res_idx: npt.NDArray[np.int32],
+    chain_res_num: npt.NDArray[np.int32],
+    chain_is_polymer: npt.NDArray[np.bool_],
+    res_type: npt.NDArray[np.int8],
+    res_idx: npt.NDArray[np.int32],
+    res_atom_idx: npt.NDArray[np.int32],
+    res_atom_num: npt.NDArray[np.int32],
+    res_atom_center: npt.NDArray[np.int32],
+    res_atom_disto: npt.NDArray[np.int32],
+    res_is_standard: npt.NDArray[np.bool_],
+    res_is_present: npt.NDArray[np.bool_],
+    res_ccd_known: npt.NDArray[np.bool_],
+    atom_is_present: npt.NDArray[np.bool_],
+    unk_id: int,
+    token_chain: npt.NDArray[np.int64],
+    token_atom_idx: npt.NDArray[np.int32],
+    token_atom_num: npt.NDArray[np.int32],
+    token_res_idx: npt.NDArray[np.int32],
+    token_res_type: npt.NDArray[np.int8],
+    token_center_idx: npt.NDArray[np.int32],
+    token_disto_idx: npt.NDArray[np.int32],
+    token_resolved_mask: npt.NDArray[np.bool_],
+    token_disto_mask: npt.NDArray[np.bool_],
+    atom_to_token: npt.NDArray[np.int32],
+) -> None:
+    """Write the per-token fields of the given chains, in order.
+
+    Each chain starts at its own chain_token_idx offset, so chains are
+    written in parallel. Chain level fields are gathered by the caller
+    from token_chain.
+    """
+    for i in numba.prange(len(chain_ids)):
+        chain_id = chain_ids[i]
+        token_idx = chain_token_idx[i]
+        res_start = chain_res_idx[chain_id]
+        res_end = res_start + chain_res_num[chain_id]
+        for res in range(res_start, res_end):
+            # Get atom indices
+            atom_start = res_atom_idx[res]
+            atom_end = atom_start + res_atom_num[res]
+
+            # Standard residues are tokens
+            if res_is_standard[res]:
+                center = res_atom_center[res]
+                disto = res_atom_disto[res]
+                token_chain[token_idx] = chain_id
+                token_atom_idx[token_idx] = atom_start
+                token_atom_num[token_idx] = res_atom_num[res]
+                token_res_idx[token_idx] = res_idx[res]
+                token_res_type[token_idx] = res_type[res]
+                token_center_idx[token_idx] = center
+                token_disto_idx[token_idx] = disto
+
+                # Token is present if centers are
+                token_resolved_mask[token_idx] = (
+                    res_is_present[res] and atom_is_present[center]
+                )
+                token_disto_mask[token_idx] = (
+                    res_is_present[res] and atom_is_present[disto]
+                )
+
+                # Update atom_idx to token_idx
+                atom_to_token[atom_start:atom_end] = token_idx
+                token_idx += 1
+                continue
 
-@dataclass
-class TokenData:
-    """TokenData datatype."""
-
-    token_idx: int
-    atom_idx: int
-    atom_num: int
-    res_idx: int
-    res_type: int
-    sym_id: int
-    asym_id: int
-    entity_id: int
-    mol_type: int
-    center_idx: int
-    disto_idx: int
-    center_coords: np.ndarray
-    disto_coords: np.ndarray
-    resolved_mask: bool
-    disto_mask: bool
-    cyclic_period: int
+            # Non-standard are tokenized per atom, using the parent residue
+            # type if known and the unk protein token otherwise
+            if chain_is_polymer[chain_id] and res_ccd_known[res]:
+                atom_res_type = res_type[res]
+            else:
+                atom_res_type = unk_id
+            atom_res_idx = res_idx[res]
+            res_present = res_is_present[res]
+
+            for atom in range(atom_start, atom_end):
+                token_chain[token_idx] = chain_id
+                token_atom_idx[token_idx] = atom
+                token_atom_num[token_idx] = 1
+                token_res_idx[token_idx] = atom_res_idx
+                token_res_type[token_idx] = atom_res_type
+                token_center_idx[token_idx] = atom
+                token_disto_idx[token_idx] = atom
+
+                # Token is present if atom is
+                is_present = res_present and atom_is_present[atom]
+                token_resolved_mask[token_idx] = is_present
+                token_disto_mask[token_idx] = is_present
+
+                # Update atom_idx to token_idx
+                atom_to_token[atom] = token_idx
+                token_idx += 1
 
 
 class BoltzTokenizer(Tokenizer):
@@ -69,149 +217,91 @@ class BoltzTokenizer(Tokenizer):
         """
         # Get structure data
         struct = data.structure
+        chains = struct.chains
+        residues = struct.residues
+        atoms = struct.atoms
 
-        # Create token data
-        token_data = []
+        # Filter to valid chains only
+        chain_ids = np.flatnonzero(struct.mask)
+
+        # Count tokens, one per standard residue and per atom otherwise
+        res_token_num = np.where(residues["is_standard"], 1, residues["atom_num"])
+        res_token_cum = np.concatenate([[0], np.cumsum(res_token_num)])
+        res_start = chains["res_idx"][chain_ids]
+        res_end = res_start + chains["res_num"][chain_ids]
+        chain_token_num = res_token_cum[res_end] - res_token_cum[res_start]
+        chain_token_idx = np.cumsum(chain_token_num) - chain_token_num
+        num_tokens = chain_token_num.sum()
+
+        # Non-standard residues keep their type on polymer chains if in the CCD
+        chain_is_polymer = np.array(
+            [t in _POLYMER_TYPES for t in chains["mol_type"].tolist()], dtype=bool
+        )
+        res_ccd_known = np.zeros(len(residues), dtype=bool)
+        non_standard = np.flatnonzero(~residues["is_standard"])
+        res_ccd_known[non_standard] = [
+            name in _CCD_SET for name in residues["name"][non_standard].tolist()
+        ]
+
+        # We use the unk protein token as res_type of unknown non-standard residues
+        unk_token = const.unk_token["PROTEIN"]
+        unk_id = const.mapping_boltz_token_ids_to_our_token_ids[
+            const.token_ids[unk_token]
+        ]
+
+        # Create token data and keep track of atom_idx to token_idx
+        token_data = np.empty(num_tokens, dtype=Token)
+        token_chain = np.empty(num_tokens, dtype=np.int64)
+        atom_to_token = np.full(len(atoms), -1, dtype=np.int32)
+        _tokenize_chains(
+            chain_ids,
+            chain_token_idx,
+            chains["res_idx"],
+            chains["res_num"],
+            chain_is_polymer,
+            residues["res_type"],
+            residues["res_idx"],
+            residues["atom_idx"],
+            residues["atom_num"],
+            residues["atom_center"],
+            residues["atom_disto"],
+            residues["is_standard"],
+            residues["is_present"],
+            res_ccd_known,
+            atoms["is_present"],
+            unk_id,
+            token_chain,
+            token_data["atom_idx"],
+            token_data["atom_num"],
+            token_data["res_idx"],
+            token_data["res_type"],
+            token_data["center_idx"],
+            token_data["disto_idx"],
+            token_data["resolved_mask"],
+            token_data["disto_mask"],
+            atom_to_token,
+        )
 
-        # Keep track of atom_idx to token_idx
-        token_idx = 0
-        atom_to_token = {}
+        # Fill in chain level fields, stored as int16
+        for field in ("sym_id", "asym_id", "entity_id", "cyclic_period"):
+            assert chains[field].max(initial=0) <= np.iinfo(np.int16).max, field
+
+        token_data["token_idx"] = np.arange(num_tokens)
+        token_data["sym_id"] = chains["sym_id"][token_chain]
+        token_data["asym_id"] = chains["asym_id"][token_chain]
+        token_data["entity_id"] = chains["entity_id"][token_chain]
+        token_data["mol_type"] = chains["mol_type"][token_chain]
+        token_data["cyclic_period"] = chains["cyclic_period"][token_chain]
+
+        # Create token bonds from ligand bonds and connections (covalent)
+        atom_1 = np.concatenate([struct.bonds["atom_1"], struct.connections["atom_1"]])
+        atom_2 = np.concatenate([struct.bonds["atom_2"], struct.connections["atom_2"]])
+        token_bonds = np.empty((len(atom_1), 2), dtype=np.int32)
+        num_bonds = _remap_bonds(atom_1, atom_2, atom_to_token, token_bonds)
+
+        # Reinterpret the (n, 2) int32 rows as TokenBond records, no copy
+        token_bonds = token_bonds[:num_bonds].view(TokenBond).reshape(-1)
 
-        # Filter to valid chains only
-        chains = struct.chains[struct.mask]
-        mol_types = chains['mol_type']
-
-        for chain, mol_type in zip(chains, mol_types):
-            # Get residue indices
-            res_start = chain["res_idx"]
-            res_end = chain["res_idx"] + chain["res_num"]
-
-            for res in struct.residues[res_start:res_end]:
-                # Get atom indices
-                atom_start = res["atom_idx"]
-                atom_end = res["atom_idx"] + res["atom_num"]
-
-                # Standard residues are tokens
-                if res["is_standard"]:
-                    # Get center and disto atoms
-                    center = struct.atoms[res["atom_center"]]
-                    disto = struct.atoms[res["atom_disto"]]
-
-                    # Token is present if centers are
-                    is_present = res["is_present"] & center["is_present"]
-                    is_disto_present = res["is_present"] & disto["is_present"]
-
-                    # Apply chain transformation
-                    c_coords = center["coords"]
-                    d_coords = disto["coords"]
-
-                    # Create token
-                    token = TokenData(
-                        token_idx=token_idx,
-                        atom_idx=res["atom_idx"],
-                        atom_num=res["atom_num"],
-                        res_idx=res["res_idx"],
-                        res_type=res["res_type"],
-                        sym_id=chain["sym_id"],
-                        asym_id=chain["asym_id"],
-                        entity_id=chain["entity_id"],
-                        mol_type=chain["mol_type"],
-                        center_idx=res["atom_center"],
-                        disto_idx=res["atom_disto"],
-                        center_coords=c_coords,
-                        disto_coords=d_coords,
-                        resolved_mask=is_present,
-                        disto_mask=is_disto_present,
-                        cyclic_period=chain["cyclic_period"],
-                    )
-                    token_data.append(astuple(token))
-
-                    # Update atom_idx to token_idx
-                    for atom_idx in range(atom_start, atom_end):
-                        atom_to_token[atom_idx] = token_idx
-
-                    token_idx += 1
-
-                # Non-standard are tokenized per atom
-                else:
-                    # We use the unk protein token as res_type
-                    unk_token = const.unk_token["PROTEIN"]
-                    # unk_id = const.token_ids[unk_token]
-                    unk_id = token=const.mapping_boltz_token_ids_to_our_token_ids[const.token_ids[unk_token]]
-                    res_name = res["name"]
-                    if const.chain_types[mol_type] != 'NONPOLYMER' and res_name in const.CCD_NAME_TO_ONE_LETTER:
-                        res_type = res["res_type"]
-                    else:
-                        res_type = unk_id
-                    # Get atom coordinates
-                    atom_data = struct.atoms[atom_start:atom_end]
-                    atom_coords = atom_data["coords"]
-
-                    # Tokenize each atom
-                    for i, atom in enumerate(atom_data):
-                        # Token is present if atom is
-                        is_present = res["is_present"] & atom["is_present"]
-                        index = atom_start + i
-
-                        # Create token
-                        token = TokenData(
-                            token_idx=token_idx,
-                            atom_idx=index,
-                            atom_num=1,
-                            res_idx=res["res_idx"],
-                            # res_type=unk_id,
-                            res_type=res_type,  ## modified, use parent residue type
-                            sym_id=chain["sym_id"],
-                            asym_id=chain["asym_id"],
-                            entity_id=chain["entity_id"],
-                            mol_type=chain["mol_type"],
-                            center_idx=index,
-                            disto_idx=index,
-                            center_coords=atom_coords[i],
-                            disto_coords=atom_coords[i],
-                            resolved_mask=is_present,
-                            disto_mask=is_present,
-                            cyclic_period=chain[
-                                "cyclic_period"
-                            ],  # Enforced to be False in chain parser
-                        )
-                        token_data.append(astuple(token))
-
-                        # Update atom_idx to token_idx
-                        atom_to_token[index] = token_idx
-                        token_idx += 1
-
-        # Create token bonds
-        token_bonds = []
-
-        # Add atom-atom bonds from ligands
-        for bond in struct.bonds:
-            if (
-                bond["atom_1"] not in atom_to_token
-                or bond["atom_2"] not in atom_to_token
-            ):
-                continue
-            token_bond = (
-                atom_to_token[bond["atom_1"]],
-                atom_to_token[bond["atom_2"]],
-            )
-            token_bonds.append(token_bond)
-
-        # Add connection bonds (covalent)
-        for conn in struct.connections:
-            if (
-                conn["atom_1"] not in atom_to_token
-                or conn["atom_2"] not in atom_to_token
-            ):
-                continue
-            token_bond = (
-                atom_to_token[conn["atom_1"]],
-                atom_to_token[conn["atom_2"]],
-            )
-            token_bonds.append(token_bond)
-
-        token_data = np.array(token_data, dtype=Token)
-        token_bonds = np.array(token_bonds, dtype=TokenBond)
         tokenized = Tokenized(
             token_data,
             token_bonds,
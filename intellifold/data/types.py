@@ -535,17 +535,15 @@ Token = [
     ("atom_num", np.dtype("i4")),
     ("res_idx", np.dtype("i4")),
     ("res_type", np.dtype("i1")),
-    ("sym_id", np.dtype("i4")),
-    ("asym_id", np.dtype("i4")),
-    ("entity_id", np.dtype("i4")),
+    ("sym_id", np.dtype("i2")),
+    ("asym_id", np.dtype("i2")),
+    ("entity_id", np.dtype("i2")),
     ("mol_type", np.dtype("i1")),
     ("center_idx", np.dtype("i4")),
     ("disto_idx", np.dtype("i4")),
-    ("center_coords", np.dtype("3f4")),
-    ("disto_coords", np.dtype("3f4")),
     ("resolved_mask", np.dtype("?")),
     ("disto_mask", np.dtype("?")),
-    ("cyclic_period", np.dtype("i4")),
+    ("cyclic_period", np.dtype("i2")),
 ]
 
 TokenBond = [
@@ -563,3 +561,25 @@ class Tokenized:
     structure: Structure
     msa: dict[str, MSA]
     residue_constraints: Optional[ResidueConstraints] = None
+
+    def center_coords(self) -> np.ndarray:
+        """Get the coordinates of the token center atoms.
+
+        Returns
+        -------
+        np.ndarray
+            The center coordinates, gathered from the structure atoms.
+
+        """
+        return self.structure.atoms["coords"][self.tokens["center_idx"]]
+
+    def disto_coords(self) -> np.ndarray:
+        """Get the coordinates of the token distogram atoms.
+
+        Returns
+        -------
+        np.ndarray
+            The distogram coordinates, gathered from the structure atoms.
+
+        """
+        return self.structure.atoms["coords"][self.tokens["disto_idx"]]